@@ -4,22 +4,93 @@ Installation script for the Smart Parking Plate Scanner
 This script will install required dependencies and test the installation
 """
 
+import asyncio
+import functools
+import importlib.metadata
 import subprocess
 import sys
 import os
 from pathlib import Path
 
-def run_command(command, description):
+async def run_command(argv, description, env=None):
     """Run a command and handle errors"""
     print(f"\n{description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print(f"✓ {description} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env
+        )
+    except OSError as e:
+        # Without a shell in between, a missing executable surfaces here instead of as exit status 127
+        print(f"✗ {description} failed:")
+        print(f"Error: {e}")
+        return False
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
         print(f"✗ {description} failed:")
-        print(f"Error: {e.stderr}")
+        print(f"Error: {stderr.decode(errors='replace')}")
         return False
+    print(f"✓ {description} completed successfully")
+    return True
+
+async def try_import(module):
+    """Import a module in a child interpreter, returning the error message if it fails"""
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, '-c', f'import {module}',
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode == 0:
+        return None
+    lines = stderr.decode(errors='replace').strip().splitlines()
+    return lines[-1] if lines else f"exit status {proc.returncode}"
+
+async def module_available(module):
+    """Check in a child interpreter whether a module can be imported"""
+    return await try_import(module) is None
+
+@functools.lru_cache(maxsize=None)
+def setup_django():
+    """Set up the Django environment once for the steps that need the ORM"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_parking.settings')
+    
+    import django
+    django.setup()
+
+def missing_requirements(path="requirements.txt"):
+    """Return the requirement lines not satisfied by the installed distributions, or None if they cannot be checked"""
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        try:
+            from pip._vendor.packaging.requirements import InvalidRequirement, Requirement
+        except ImportError:
+            return None
+    
+    missing = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                print(f"⚠ Skipping unrecognised requirement: {line}")
+                continue
+            if req.marker is not None and not req.marker.evaluate():
+                continue
+            try:
+                installed = importlib.metadata.version(req.name)
+            except importlib.metadata.PackageNotFoundError:
+                missing.append(str(req))
+                continue
+            if not req.specifier.contains(installed, prereleases=True):
+                missing.append(str(req))
+    return missing
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -31,35 +102,54 @@ def check_python_version():
     print(f"✓ Python {version.major}.{version.minor}.{version.micro} is compatible")
     return True
 
-def install_dependencies():
+async def install_dependencies():
     """Install required dependencies"""
     print("\nInstalling dependencies...")
     
-    # Install basic requirements
-    if not run_command("pip install -r requirements.txt", "Installing basic requirements"):
-        return False
+    # Probe EasyOCR and PyTorch concurrently without importing them here
+    easyocr_installed, torch_installed = await asyncio.gather(
+        module_available('easyocr'),
+        module_available('torch')
+    )
+    
+    packages = []
     
     # Install EasyOCR separately if needed
-    try:
-        import easyocr
+    if easyocr_installed:
         print("✓ EasyOCR is already installed")
-    except ImportError:
-        print("Installing EasyOCR...")
-        if not run_command("pip install easyocr", "Installing EasyOCR"):
-            return False
+    else:
+        packages.append("easyocr")
     
     # Install PyTorch if needed
-    try:
-        import torch
+    if torch_installed:
         print("✓ PyTorch is already installed")
-    except ImportError:
-        print("Installing PyTorch...")
-        if not run_command("pip install torch torchvision", "Installing PyTorch"):
-            return False
+    else:
+        packages.extend(["torch", "torchvision"])
+    
+    # Only hand pip what isn't installed yet, its resolver walks the whole graph otherwise
+    missing = missing_requirements()
+    if missing is None:
+        requirements = ['-r', 'requirements.txt']
+    else:
+        requirements = missing
+    
+    if not requirements and not packages:
+        print("✓ All requirements are already satisfied")
+        return True
+    
+    # Resolve everything in a single pip run instead of one per package group
+    argv = [sys.executable, '-m', 'pip', 'install', '--no-input', '--prefer-binary']
+    argv.extend(requirements)
+    argv.extend(packages)
+    
+    # Skip .pyc generation during install, the interpreter compiles lazily on import
+    env = dict(os.environ, PIP_NO_COMPILE="1")
+    if not await run_command(argv, "Installing requirements", env=env):
+        return False
     
     return True
 
-def test_imports():
+async def test_imports():
     """Test if all required modules can be imported"""
     print("\nTesting imports...")
     
@@ -74,12 +164,14 @@ def test_imports():
     
     failed_imports = []
     
-    for module in required_modules:
-        try:
-            __import__(module)
+    # Each import runs in its own interpreter, so the slow ones (torch, easyocr) overlap
+    errors = await asyncio.gather(*(try_import(module) for module in required_modules))
+    
+    for module, error in zip(required_modules, errors):
+        if error is None:
             print(f"✓ {module} imported successfully")
-        except ImportError as e:
-            print(f"✗ Failed to import {module}: {e}")
+        else:
+            print(f"✗ Failed to import {module}: {error}")
             failed_imports.append(module)
     
     if failed_imports:
@@ -95,10 +187,7 @@ def test_scanner():
     
     try:
         # Set up Django environment
-        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_parking.settings')
-        
-        import django
-        django.setup()
+        setup_django()
         
         from plate_scanner.scanner import PlateScanner
         
@@ -110,7 +199,7 @@ def test_scanner():
         test_plates = ["ABC-1234", "XYZ-5678", "AB-1234", "A-12345"]
         
         for plate in test_plates:
-            result = scanner.validate_plate(plate)
+            result = scanner.validate_text(plate)
             if result:
                 print(f"✓ Plate validation works: {plate} -> {result}")
             else:
@@ -132,10 +221,7 @@ def create_sample_data():
     
     try:
         # Set up Django environment
-        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_parking.settings')
-        
-        import django
-        django.setup()
+        setup_django()
         
         from plate_scanner.models import Vehicle, ParkingRate
         
@@ -167,7 +253,7 @@ def create_sample_data():
         print(f"✗ Failed to create sample data: {e}")
         return False
 
-def main():
+async def main():
     """Main installation function"""
     print("Smart Parking Plate Scanner Installation")
     print("=" * 50)
@@ -177,12 +263,12 @@ def main():
         sys.exit(1)
     
     # Install dependencies
-    if not install_dependencies():
+    if not await install_dependencies():
         print("\n✗ Installation failed. Please check the errors above.")
         sys.exit(1)
     
     # Test imports
-    if not test_imports():
+    if not await test_imports():
         print("\n✗ Import test failed. Please check the errors above.")
         sys.exit(1)
     
@@ -211,4 +297,4 @@ def main():
     print("python smart_parking/manage.py runserver")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
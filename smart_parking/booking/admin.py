@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from .models import Category, Slot, Booking, Admin, DriverUser
 
 @admin.register(Category)
@@ -12,6 +13,17 @@ class SlotAdmin(admin.ModelAdmin):
     list_filter = ('category', 'is_available')
     search_fields = ('slot_number',)
     list_editable = ('is_available',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('category')
+
+class BookingChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # The list only renders these columns, so don't haul qr_code and the rest of the row
+        return super().get_queryset(request, exclude_parameters).only(
+            'booking_id', 'driver_name', 'vehicle_no', 'booking_time',
+            'slot__slot_number', 'slot__category__name'
+        )
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
@@ -19,6 +31,12 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = ('slot__category', 'booking_time')
     search_fields = ('driver_name', 'vehicle_no')
     readonly_fields = ('booking_id', 'qr_code')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('slot', 'slot__category')
+    
+    def get_changelist(self, request, **kwargs):
+        return BookingChangeList
 
 @admin.register(Admin)
 class AdminAdmin(admin.ModelAdmin):
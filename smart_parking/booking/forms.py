@@ -86,7 +86,7 @@ class BookingForm(forms.ModelForm):
         model = Booking
         fields = ['driver_name', 'mobile_no', 'vehicle_no', 'vehicle_type', 'booking_time']
         widgets = {
-            'booking_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'booking_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -105,7 +105,7 @@ class RegisteredDriverBookingForm(forms.ModelForm):
         model = Booking
         fields = ['vehicle_no', 'booking_time']
         widgets = {
-            'booking_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'booking_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -129,7 +129,7 @@ class TemporaryBookingForm(forms.ModelForm):
         model = Booking
         fields = ['driver_name', 'mobile_no', 'email', 'vehicle_no', 'vehicle_type', 'booking_time']
         widgets = {
-            'booking_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'booking_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,66 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from booking.models import Slot, Booking
+
+COLUMNS = ('driver_name', 'mobile_no', 'vehicle_no', 'vehicle_type', 'slot_number', 'booking_time')
+
+class Command(BaseCommand):
+    help = 'Import bookings from a CSV file (driver_name, mobile_no, vehicle_no, vehicle_type, slot_number, booking_time)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the CSV file to import')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT statement')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], newline='') as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(f'Could not read {options["csv_file"]}: {e}')
+        
+        # Resolve every slot number with one query instead of one per row
+        slots = Slot.objects.in_bulk(
+            {row.get('slot_number') for row in rows}, field_name='slot_number'
+        )
+        bookings = []
+        booked_slot_ids = set()
+        for line_no, row in enumerate(rows, start=2):
+            # Absent from the header, or cut off on a short line
+            missing = [column for column in COLUMNS if row.get(column) is None]
+            if missing:
+                self.stdout.write(self.style.WARNING(f'Line {line_no}: missing {", ".join(missing)}, skipped'))
+                continue
+            slot = slots.get(row['slot_number'])
+            if slot is None:
+                self.stdout.write(self.style.WARNING(f'Line {line_no}: unknown slot {row["slot_number"]}, skipped'))
+                continue
+            # A slot can take one booking, whether it is already taken or claimed by an earlier line
+            if not slot.is_available or slot.pk in booked_slot_ids:
+                self.stdout.write(self.style.WARNING(f'Line {line_no}: slot {slot.slot_number} is already booked, skipped'))
+                continue
+            try:
+                booking_time = parse_datetime(row['booking_time'])
+            except ValueError:
+                # Well-formed but impossible dates, such as month 13
+                booking_time = None
+            if booking_time is None:
+                self.stdout.write(self.style.WARNING(f'Line {line_no}: invalid booking_time {row["booking_time"]}, skipped'))
+                continue
+            bookings.append(Booking(
+                driver_name=row['driver_name'],
+                mobile_no=row['mobile_no'],
+                vehicle_no=row['vehicle_no'],
+                vehicle_type=row['vehicle_type'],
+                slot=slot,
+                booking_time=booking_time,
+            ))
+            booked_slot_ids.add(slot.pk)
+        
+        try:
+            created = Booking.bulk_book(bookings, batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            self.style.SUCCESS(f'Imported {len(created)} bookings')
+        )
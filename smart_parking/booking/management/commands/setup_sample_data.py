@@ -16,15 +16,22 @@ class Command(BaseCommand):
             {'name': 'Motorcycle Parking'},
         ]
         
-        for cat_data in categories_data:
-            category, created = Category.objects.get_or_create(
-                name=cat_data['name']
-            )
-            if created:
-                self.stdout.write(f'Created category: {category.name}')
+        existing_categories = set(
+            Category.objects.filter(
+                name__in=[cat_data['name'] for cat_data in categories_data]
+            ).values_list('name', flat=True)
+        )
+        new_categories = Category.objects.bulk_create([
+            Category(name=cat_data['name'])
+            for cat_data in categories_data
+            if cat_data['name'] not in existing_categories
+        ])
+        for category in new_categories:
+            self.stdout.write(f'Created category: {category.name}')
         
         # Create slots for each category
         categories = Category.objects.all()
+        new_slots = []
         for category in categories:
             if category.name == 'Standard Parking':
                 slot_count = 20
@@ -37,15 +44,25 @@ class Command(BaseCommand):
             else:
                 slot_count = 5
             
-            for i in range(1, slot_count + 1):
-                slot_number = f"{category.name[:3].upper()}{i:02d}"
-                slot, created = Slot.objects.get_or_create(
-                    slot_number=slot_number,
-                    category=category,
-                    defaults={'is_available': True}
-                )
-                if created:
-                    self.stdout.write(f'Created slot: {slot.slot_number}')
+            prefix = category.name[:3].upper()
+            new_slots.extend(
+                Slot(slot_number=f"{prefix}{i:02d}", category=category, is_available=True)
+                for i in range(1, slot_count + 1)
+            )
+        
+        # Skip slots that already exist so the whole batch goes out in one INSERT
+        existing_slots = set(
+            Slot.objects.filter(
+                slot_number__in=[slot.slot_number for slot in new_slots]
+            ).values_list('slot_number', flat=True)
+        )
+        new_slots = Slot.objects.bulk_create(
+            [slot for slot in new_slots if slot.slot_number not in existing_slots],
+            ignore_conflicts=True,
+            batch_size=500
+        )
+        for slot in new_slots:
+            self.stdout.write(f'Created slot: {slot.slot_number}')
         
         # Create sample drivers
         drivers_data = [
@@ -81,13 +98,23 @@ class Command(BaseCommand):
             }
         ]
         
-        for driver_data in drivers_data:
-            driver, created = Driver.objects.get_or_create(
+        existing_drivers = set(
+            Driver.objects.filter(
+                email__in=[driver_data['email'] for driver_data in drivers_data]
+            ).values_list('email', flat=True)
+        )
+        new_drivers = Driver.objects.bulk_create([
+            Driver(
+                name=driver_data['name'],
+                mobile_no=driver_data['mobile_no'],
                 email=driver_data['email'],
-                defaults=driver_data
+                licence_no=driver_data['licence_no']
             )
-            if created:
-                self.stdout.write(f'Created driver: {driver.name}')
+            for driver_data in drivers_data
+            if driver_data['email'] not in existing_drivers
+        ])
+        for driver in new_drivers:
+            self.stdout.write(f'Created driver: {driver.name}')
         
         self.stdout.write(
             self.style.SUCCESS('Sample data setup completed successfully!')
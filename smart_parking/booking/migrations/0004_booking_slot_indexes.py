@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-14 04:08
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_admin_driveruser'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_time',
+            field=models.DateTimeField(db_index=True, default=datetime.datetime.now),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='driver_name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='vehicle_no',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['slot', 'booking_time'], name='booking_boo_slot_id_a052e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['category', 'is_available'], name='booking_slo_categor_e4c3e7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['is_available'], name='booking_slo_is_avai_ab4a61_idx'),
+        ),
+    ]
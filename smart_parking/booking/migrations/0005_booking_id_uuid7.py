@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-14 04:08
+
+import booking.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_booking_slot_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_id',
+            field=models.UUIDField(default=booking.models.uuid7, editable=False, unique=True),
+        ),
+    ]
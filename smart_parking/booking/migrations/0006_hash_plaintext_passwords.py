@@ -0,0 +1,24 @@
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations
+
+
+def hash_plaintext_passwords(apps, schema_editor):
+    for model_name in ('Admin', 'DriverUser'):
+        model = apps.get_model('booking', model_name)
+        for user in model.objects.only('id', 'password'):
+            try:
+                identify_hasher(user.password)
+            except ValueError:
+                user.password = make_password(user.password)
+                user.save(update_fields=['password'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_id_uuid7'),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_plaintext_passwords, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_vehicle_numbers(apps, schema_editor):
+    DriverUser = apps.get_model('booking', 'DriverUser')
+    duplicates = (
+        DriverUser.objects.values('vehicle_no')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('vehicle_no', flat=True)
+    )
+    if not duplicates:
+        return
+    # Which account keeps a shared vehicle number is an admin decision, so list them rather than guess
+    lines = []
+    for vehicle_no in duplicates:
+        usernames = DriverUser.objects.filter(vehicle_no=vehicle_no).order_by('id').values_list('username', flat=True)
+        lines.append(f"  {vehicle_no}: {', '.join(usernames)}")
+    raise RuntimeError(
+        "Cannot make DriverUser.vehicle_no unique while these vehicle numbers are registered "
+        "to more than one driver user. Correct or remove the duplicates, then migrate again:\n"
+        + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_booking_time_timezone_now'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_vehicle_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='driveruser',
+            name='vehicle_no',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+    ]
@@ -1,10 +1,48 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
+from celery import chain
+from kombu.exceptions import KombuError
 import qrcode
+from qrcode.image.pil import PilImage
 from io import BytesIO
-from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.cache import cache
+import logging
+import os
+import time
 import uuid
-from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+def delay_on_commit(signature):
+    """Queue a task signature once the transaction commits, logging rather than raising if the broker is down,
+    since the row it belongs to is already saved"""
+    def send():
+        try:
+            signature.delay()
+        except (KombuError, OSError):
+            logger.exception('Could not queue %s', signature)
+    transaction.on_commit(send)
+
+def uuid7():
+    """Time-ordered UUID (version 7) so new booking ids are appended to the index instead of scattered"""
+    unix_ms = time.time_ns() // 1_000_000
+    value = (unix_ms & 0xFFFFFFFFFFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+# Booking QR payloads are ~140 characters, which fits version 6 at ERROR_CORRECT_L
+QR_MIN_VERSION = 6
+QR_MASK_PATTERN = 0
+# Booking details of the DriverUser owning a vehicle number, read by confirm_booking
+DRIVER_USER_CACHE_KEY = 'driveruser:vn:{}'
+DRIVER_USER_CACHE_TIMEOUT = 300
+# Sent with bookings= after Booking.bulk_book, which saves without post_save
+bookings_bulk_created = Signal()
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -19,56 +57,101 @@ class Slot(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     is_available = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'is_available']),
+            models.Index(fields=['is_available']),
+        ]
+    
     def __str__(self):
         return f"{self.slot_number} ({self.category.name})"
 
 class Booking(models.Model):
-    booking_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
-    driver_name = models.CharField(max_length=100)
+    booking_id = models.UUIDField(default=uuid7, editable=False, unique=True)
+    driver_name = models.CharField(max_length=100, db_index=True)
     mobile_no = models.CharField(max_length=15)
-    vehicle_no = models.CharField(max_length=20)
+    vehicle_no = models.CharField(max_length=20, db_index=True)
     vehicle_type = models.CharField(max_length=50)
     slot = models.ForeignKey(Slot, on_delete=models.CASCADE)
-    booking_time = models.DateTimeField(default=datetime.now)
+    booking_time = models.DateTimeField(default=timezone.now, db_index=True)
     qr_code = models.ImageField(upload_to='qr_codes/', blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['slot', 'booking_time']),
+        ]
+    
     def __str__(self):
         return f"{self.driver_name} - {self.slot.slot_number}"
     
-    def save(self, *args, **kwargs):
-        if not self.qr_code:
-            self.generate_qr_code()
-        super().save(*args, **kwargs)
-        # Update slot availability
-        self.slot.is_available = False
-        self.slot.save()
+    def save(self, *args, confirmation_email=None, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'slot' in update_fields:
+                # Update slot availability with a single-column UPDATE
+                Slot.objects.filter(pk=self.slot_id).update(is_available=False)
+                self.slot.is_available = False
+            # QR rendering is queued so the request doesn't wait on it; a confirmation email
+            # is chained after it, so the mail attaches that QR code instead of rendering its own
+            from .tasks import generate_booking_qr, send_booking_confirmation_email_with_email
+            tasks = []
+            if not self.qr_code:
+                tasks.append(generate_booking_qr.si(self.pk))
+            if confirmation_email:
+                tasks.append(send_booking_confirmation_email_with_email.si(self.pk, confirmation_email))
+            if tasks:
+                delay_on_commit(chain(*tasks))
+    
+    @classmethod
+    def bulk_book(cls, bookings, batch_size=1000):
+        """Insert many bookings in batched INSERTs, occupying their slots and queuing their QR codes"""
+        with transaction.atomic():
+            # Lock the slots and refuse the batch if it would double-book any of them
+            slot_ids = [booking.slot_id for booking in bookings]
+            available = set(
+                Slot.objects.select_for_update().filter(pk__in=slot_ids, is_available=True).values_list('pk', flat=True)
+            )
+            if len(set(slot_ids)) != len(slot_ids) or not available.issuperset(slot_ids):
+                raise ValueError('Bookings must each take a different, available slot')
+            created = cls.objects.bulk_create(bookings, batch_size=batch_size)
+            Slot.objects.filter(pk__in={booking.slot_id for booking in created}).update(is_available=False)
+            from .tasks import generate_booking_qr
+            for booking in created:
+                delay_on_commit(generate_booking_qr.si(booking.pk))
+            bookings_bulk_created.send(sender=cls, bookings=created)
+        return created
     
     def generate_qr_code(self):
+        # Start the fit at the version a typical payload needs and pin the mask pattern,
+        # so qrcode doesn't build the matrix once per candidate mask to score them
         qr = qrcode.QRCode(
-            version=1,
+            version=QR_MIN_VERSION,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
             box_size=10,
             border=4,
+            mask_pattern=QR_MASK_PATTERN,
+        )
+        qr.add_data(
+            f"Booking ID: {self.booking_id}\n"
+            f"Driver: {self.driver_name}\n"
+            f"Vehicle: {self.vehicle_no}\n"
+            f"Slot: {self.slot.slot_number}\n"
+            f"Time: {self.booking_time}"
         )
-        qr.add_data(f"""
-            Booking ID: {self.booking_id}
-            Driver: {self.driver_name}
-            Vehicle: {self.vehicle_no}
-            Slot: {self.slot.slot_number}
-            Time: {self.booking_time}
-        """)
         qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
+        # Black on white renders as a 1-bit image; PNG zlib is the dominant cost, so keep it cheap
+        img = qr.make_image(image_factory=PilImage, fill_color="black", back_color="white")
         buffer = BytesIO()
-        img.save(buffer)
+        img.save(buffer, format='PNG', optimize=False, compress_level=1)
         filename = f'qr_{self.booking_id}.png'
-        self.qr_code.save(filename, File(buffer), save=False)
+        self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
 
 class Admin(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     username = models.CharField(max_length=50, unique=True)
-    password = models.CharField(max_length=128)  # In production, use proper password hashing
+    password = models.CharField(max_length=128)  # Hashed with django.contrib.auth.hashers
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -78,10 +161,10 @@ class DriverUser(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     username = models.CharField(max_length=50, unique=True)
-    password = models.CharField(max_length=128)  # In production, use proper password hashing
+    password = models.CharField(max_length=128)  # Hashed with django.contrib.auth.hashers
     mobile_no = models.CharField(max_length=15)
     licence_no = models.CharField(max_length=50)
-    vehicle_no = models.CharField(max_length=20)
+    vehicle_no = models.CharField(max_length=20, unique=True)
     vehicle_type = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -97,4 +180,15 @@ class Driver(models.Model):
     def __str__(self):
         return f"{self.name} ({self.licence_no})"
 
-    
\ No newline at end of file
+# Kept here rather than in signals.py, which this app never imports
+@receiver(pre_save, sender=DriverUser)
+def clear_previous_driver_user_cache(sender, instance, **kwargs):
+    # A changed vehicle number must also drop the entry cached under the old one
+    if instance.pk:
+        old_vehicle_no = DriverUser.objects.filter(pk=instance.pk).values_list('vehicle_no', flat=True).first()
+        if old_vehicle_no and old_vehicle_no != instance.vehicle_no:
+            cache.delete(DRIVER_USER_CACHE_KEY.format(old_vehicle_no))
+
+@receiver([post_save, post_delete], sender=DriverUser)
+def clear_driver_user_cache(sender, instance, **kwargs):
+    cache.delete(DRIVER_USER_CACHE_KEY.format(instance.vehicle_no))
@@ -1,20 +1,16 @@
 # myapp/signals.py
+# Dormant: nothing imports this module (BookingConfig.ready does not), so this receiver is
+# never connected. Booking's own receivers, such as the DriverUser cache ones, live in booking/models.py.
 
-from django.conf import settings
-from django.core.mail import send_mail
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 @receiver(post_save, sender=User)
 def send_welcome_email(sender, instance, created, **kwargs):
     if created:
-        subject = 'Welcome to Our Service!'
-        message = f'Hello {instance.username},\n\nThank you for registering!'
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [instance.email],
-            fail_silently=False
-        )
+        # SMTP runs in a Celery worker once the user row is committed, not inside the save
+        from .tasks import send_user_welcome_email
+        user_pk = instance.pk
+        transaction.on_commit(lambda: send_user_welcome_email.delay(user_pk))
@@ -0,0 +1,132 @@
+import smtplib
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail, EmailMessage
+from django.contrib.auth.models import User
+from .models import Booking, Driver, DriverUser
+
+WELCOME_SUBJECT = 'Welcome to Smart Parking System'
+WELCOME_TEMPLATE = """
+Dear {name},
+
+Welcome to our Smart Parking System! Your registration has been successful.
+
+Registration Details:
+- Name: {name}
+- License No: {licence_no}
+- Email: {email}
+
+You can now use the "Registered Driver Booking" option to book parking slots quickly.
+
+Thank you for choosing our service!
+
+Best regards,
+Smart Parking Team
+"""
+
+BOOKING_CONFIRMATION_SUBJECT = 'Parking Booking Confirmation'
+BOOKING_CONFIRMATION_TEMPLATE = """
+Dear {driver_name},
+
+Your parking booking has been confirmed!
+
+Booking Details:
+- Booking ID: {booking_id}
+- Parking Slot: {slot_number}
+- Vehicle: {vehicle_no} ({vehicle_type})
+- Date & Time: {booking_time}
+
+Please arrive on time and present your QR code at the entrance.
+
+Thank you for choosing our service!
+
+Best regards,
+Smart Parking Team
+"""
+
+@shared_task
+def generate_booking_qr(booking_id):
+    """Render the QR code for a booking outside the request cycle"""
+    booking = Booking.objects.select_related('slot').get(pk=booking_id)
+    if booking.qr_code:
+        return
+    booking.generate_qr_code()
+    booking.save(update_fields=['qr_code'])
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_welcome_email_driver_user(self, driver_user_id):
+    """Send welcome email to newly registered driver user, retrying if the mail server is unavailable"""
+    driver_user = DriverUser.objects.get(pk=driver_user_id)
+    message = WELCOME_TEMPLATE.format(
+        name=driver_user.name, licence_no=driver_user.licence_no, email=driver_user.email
+    )
+    try:
+        send_mail(
+            WELCOME_SUBJECT,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [driver_user.email],
+            fail_silently=False
+        )
+    except (smtplib.SMTPException, OSError) as e:
+        raise self.retry(exc=e)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_booking_confirmation_email_with_email(self, booking_id, email):
+    """Send booking confirmation email with slot details to the given email address, attaching the QR code image."""
+    # Chained after generate_booking_qr by Booking.save, so the QR code has been rendered by now
+    booking = Booking.objects.select_related('slot').get(pk=booking_id)
+    message = BOOKING_CONFIRMATION_TEMPLATE.format(
+        driver_name=booking.driver_name,
+        booking_id=booking.booking_id,
+        slot_number=booking.slot.slot_number,
+        vehicle_no=booking.vehicle_no,
+        vehicle_type=booking.vehicle_type,
+        booking_time=booking.booking_time,
+    )
+    try:
+        email_msg = EmailMessage(
+            BOOKING_CONFIRMATION_SUBJECT,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
+        )
+        # Attach QR code if it exists
+        if booking.qr_code and hasattr(booking.qr_code, 'path'):
+            email_msg.attach_file(booking.qr_code.path)
+        email_msg.send(fail_silently=False)
+    except (smtplib.SMTPException, OSError) as e:
+        raise self.retry(exc=e)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_welcome_email(self, driver_id):
+    """Send welcome email to newly registered driver, retrying if the mail server is unavailable"""
+    driver = Driver.objects.get(pk=driver_id)
+    message = WELCOME_TEMPLATE.format(
+        name=driver.name, licence_no=driver.licence_no, email=driver.email
+    )
+    try:
+        send_mail(
+            WELCOME_SUBJECT,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [driver.email],
+            fail_silently=False
+        )
+    except (smtplib.SMTPException, OSError) as e:
+        raise self.retry(exc=e)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_user_welcome_email(self, user_id):
+    """Send welcome email to a newly created auth user, retrying if the mail server is unavailable"""
+    user = User.objects.get(pk=user_id)
+    try:
+        send_mail(
+            'Welcome to Our Service!',
+            f'Hello {user.username},\n\nThank you for registering!',
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+            fail_silently=False
+        )
+    except (smtplib.SMTPException, OSError) as e:
+        raise self.retry(exc=e)
@@ -1,3 +1,101 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from kombu.exceptions import OperationalError
+
+from .models import Booking, Category, Slot, delay_on_commit
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+CSV_HEADER = 'driver_name,mobile_no,vehicle_no,vehicle_type,slot_number,booking_time\n'
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkBookTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Car')
+        self.slot_a = Slot.objects.create(slot_number='A1', category=category)
+        self.slot_b = Slot.objects.create(slot_number='A2', category=category)
+
+    def booking(self, slot, vehicle_no='CAR1'):
+        return Booking(driver_name='Driver', mobile_no='0771234567', vehicle_no=vehicle_no, vehicle_type='car', slot=slot)
+
+    def test_bulk_book_occupies_slots(self):
+        created = Booking.bulk_book([self.booking(self.slot_a), self.booking(self.slot_b, 'CAR2')])
+        self.assertEqual(len(created), 2)
+        self.assertFalse(Slot.objects.filter(is_available=True).exists())
+
+    def test_bulk_book_rejects_double_booking(self):
+        with self.assertRaises(ValueError):
+            Booking.bulk_book([self.booking(self.slot_a), self.booking(self.slot_a, 'CAR2')])
+        Slot.objects.filter(pk=self.slot_b.pk).update(is_available=False)
+        with self.assertRaises(ValueError):
+            Booking.bulk_book([self.booking(self.slot_b)])
+        self.assertFalse(Booking.objects.exists())
+
+    def import_csv(self, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(CSV_HEADER + rows)
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command('import_bookings', f.name, stdout=out)
+        return out.getvalue()
+
+    def test_import_skips_bad_rows(self):
+        output = self.import_csv(
+            'Good,0771234567,CAR1,car,A1,2026-01-01 10:00+05:30\n'
+            'Impossible date,0771234567,CAR2,car,A2,2026-13-01 10:00\n'
+            'Same slot,0771234567,CAR3,car,A1,2026-01-01 11:00+05:30\n'
+            'Unknown slot,0771234567,CAR4,car,Z9,2026-01-01 10:00+05:30\n'
+        )
+        self.assertIn('Imported 1 bookings', output)
+        self.assertIn('invalid booking_time 2026-13-01 10:00', output)
+        self.assertIn('slot A1 is already booked', output)
+        self.assertIn('unknown slot Z9', output)
+        self.assertEqual(list(Booking.objects.values_list('vehicle_no', flat=True)), ['CAR1'])
+
+    def test_import_skips_rows_with_missing_columns(self):
+        output = self.import_csv('Short row,0771234567,CAR1,car,A1\n')
+        self.assertIn('missing booking_time', output)
+        self.assertFalse(Booking.objects.exists())
+
+
+class DelayOnCommitTests(TestCase):
+    def test_broker_error_is_logged_not_raised(self):
+        signature = mock.Mock()
+        signature.delay.side_effect = OperationalError('broker unreachable')
+        with self.assertLogs('booking.models', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                delay_on_commit(signature)
+        signature.delay.assert_called_once_with()
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ROOT_URLCONF='smart_parking.urls')
+class SelectSlotTests(TestCase):
+    def test_groups_slots_by_category(self):
+        car = Category.objects.create(name='Car')
+        Category.objects.create(name='Bike')
+        Slot.objects.create(slot_number='A1', category=car)
+        Slot.objects.create(slot_number='A2', category=car, is_available=False)
+        session = self.client.session
+        session['booking_data'] = {'driver_name': 'Driver'}
+        session.save()
+
+        response = self.client.get(reverse('booking:select_slot'))
+
+        categories = response.context['categories']
+        self.assertEqual([category['name'] for category in categories], ['Car', 'Bike'])
+        self.assertEqual(
+            [(slot['slot_number'], slot['is_available']) for slot in categories[0]['slots']],
+            [('A1', True), ('A2', False)],
+        )
+        self.assertEqual(categories[1]['slots'], [])
+
+    def test_redirects_without_booking_data(self):
+        response = self.client.get(reverse('booking:select_slot'))
+        self.assertRedirects(response, reverse('booking:home'), fetch_redirect_response=False)
@@ -24,6 +24,7 @@ urlpatterns = [
     path('select-slot/', views.select_slot, name='select_slot'),
     path('confirm-booking/<int:slot_id>/', views.confirm_booking, name='confirm_booking'),
     path('booking-success/<uuid:booking_id>/', views.booking_success, name='booking_success'),
+    path('booking-qr-status/<uuid:booking_id>/', views.qr_status, name='qr_status'),
     path('registration-success/', views.registration_success, name='registration_success'),
     path('login/', views.login_view, name='login'),
     path('delete-booking/<uuid:booking_id>/', views.delete_booking, name='delete_booking'),
@@ -1,12 +1,22 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib import messages
-from django.core.mail import send_mail, EmailMessage
-from django.conf import settings
-from .models import Category, Slot, Booking, Driver, Admin, DriverUser
+from django.db import transaction
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.views.decorators.cache import cache_page
+from .models import Category, Slot, Booking, Driver, Admin, DriverUser, DRIVER_USER_CACHE_KEY, delay_on_commit, DRIVER_USER_CACHE_TIMEOUT
+from .tasks import send_welcome_email, send_welcome_email_driver_user
 from .forms import BookingForm, RegisteredDriverBookingForm, TemporaryBookingForm, DriverRegistrationForm, AdminRegistrationForm, AdminLoginForm, DriverUserRegistrationForm, DriverUserLoginForm
-from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 from django.contrib.auth import authenticate, login
+from django.contrib.auth.hashers import make_password, check_password
 
+# Static pages are served straight from the cache for an hour
+STATIC_PAGE_CACHE_TIMEOUT = 60 * 60
+
+@cache_page(STATIC_PAGE_CACHE_TIMEOUT)
 def home(request):
     return render(request, 'booking/home.html')
 
@@ -16,7 +26,7 @@ def admin_registration(request):
         form = AdminRegistrationForm(request.POST)
         if form.is_valid():
             admin = form.save(commit=False)
-            # In production, use proper password hashing
+            admin.password = make_password(form.cleaned_data['password'])
             admin.save()
             messages.success(request, 'Admin registration successful! Please login.')
             return redirect('booking:admin_login')
@@ -36,14 +46,16 @@ def admin_login(request):
             password = form.cleaned_data['password']
             
             try:
-                admin = Admin.objects.get(username=username, password=password)
+                admin = Admin.objects.only('id', 'name', 'password').get(username=username)
+            except Admin.DoesNotExist:
+                admin = None
+            if admin and check_password(password, admin.password):
                 request.session['admin_id'] = admin.id
                 request.session['admin_name'] = admin.name
                 request.session['user_type'] = 'admin'
                 messages.success(request, f'Welcome, {admin.name}!')
                 return redirect('booking:admin_dashboard')
-            except Admin.DoesNotExist:
-                messages.error(request, 'Invalid username or password.')
+            messages.error(request, 'Invalid username or password.')
     else:
         form = AdminLoginForm()
     
@@ -51,32 +63,15 @@ def admin_login(request):
         'form': form
     })
 
-def send_welcome_email_driver_user(driver_user):
-    """Send welcome email to newly registered driver user"""
-    subject = 'Welcome to Smart Parking System'
-    message = f"""
-    Dear {driver_user.name},
-    \nWelcome to our Smart Parking System! Your registration has been successful.\n\nRegistration Details:\n- Name: {driver_user.name}\n- License No: {driver_user.licence_no}\n- Email: {driver_user.email}\n\nYou can now use the \"Registered Driver Booking\" option to book parking slots quickly.\n\nThank you for choosing our service!\n\nBest regards,\nSmart Parking Team\n    """
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [driver_user.email],
-            fail_silently=False
-        )
-    except Exception as e:
-        print(f"Failed to send welcome email to driver user: {e}")
-
 def driver_user_registration(request):
     """Handle driver user registration"""
     if request.method == 'POST':
         form = DriverUserRegistrationForm(request.POST)
         if form.is_valid():
             driver_user = form.save(commit=False)
-            # In production, use proper password hashing
+            driver_user.password = make_password(form.cleaned_data['password'])
             driver_user.save()
-            send_welcome_email_driver_user(driver_user)
+            delay_on_commit(send_welcome_email_driver_user.si(driver_user.pk))
             messages.success(request, 'Driver registration successful! Please login.')
             return redirect('booking:driver_login')
     else:
@@ -96,14 +91,16 @@ def driver_login(request):
             password = form.cleaned_data['password']
             
             try:
-                driver_user = DriverUser.objects.get(username=username, password=password)
+                driver_user = DriverUser.objects.only('id', 'name', 'password').get(username=username)
+            except DriverUser.DoesNotExist:
+                driver_user = None
+            if driver_user and check_password(password, driver_user.password):
                 request.session['driver_id'] = driver_user.id
                 request.session['driver_name'] = driver_user.name
                 request.session['user_type'] = 'driver'
                 messages.success(request, f'Welcome, {driver_user.name}!')
                 return redirect('booking:driver_dashboard')
-            except DriverUser.DoesNotExist:
-                messages.error(request, 'Invalid username or password.')
+            messages.error(request, 'Invalid username or password.')
     else:
         form = DriverUserLoginForm()
     
@@ -138,9 +135,7 @@ def registered_driver_booking(request):
             }
             return redirect('booking:select_slot')
     else:
-        form = RegisteredDriverBookingForm(initial={
-            'booking_time': datetime.now().strftime('%Y-%m-%dT%H:%M')
-        })
+        form = RegisteredDriverBookingForm()
     
     return render(request, 'booking/registered_driver_booking.html', {
         'form': form
@@ -163,9 +158,7 @@ def temporary_booking(request):
             }
             return redirect('booking:select_slot')
     else:
-        form = TemporaryBookingForm(initial={
-            'booking_time': datetime.now().strftime('%Y-%m-%dT%H:%M')
-        })
+        form = TemporaryBookingForm()
     
     return render(request, 'booking/temporary_booking.html', {
         'form': form,
@@ -179,7 +172,7 @@ def driver_registration(request):
         if form.is_valid():
             driver = form.save()
             # Send welcome email
-            send_welcome_email(driver)
+            delay_on_commit(send_welcome_email.si(driver.pk))
             return redirect('booking:registration_success')
     else:
         form = DriverRegistrationForm()
@@ -194,55 +187,66 @@ def select_slot(request):
     if 'booking_data' not in request.session:
         return redirect('booking:home')
     
-    categories = Category.objects.prefetch_related('slot_set').all()
+    # One LEFT JOIN over plain dicts; categories without slots still come back with slot__id=None
+    rows = Category.objects.order_by('id', 'slot__id').values(
+        'id', 'name', 'slot__id', 'slot__slot_number', 'slot__is_available'
+    )
+    categories = []
+    for (category_id, name), category_rows in groupby(rows, key=itemgetter('id', 'name')):
+        categories.append({
+            'name': name,
+            'slots': [
+                {
+                    'id': row['slot__id'],
+                    'slot_number': row['slot__slot_number'],
+                    'is_available': row['slot__is_available'],
+                }
+                for row in category_rows
+                if row['slot__id'] is not None
+            ],
+        })
     return render(request, 'booking/select_slot.html', {
         'categories': categories
     })
 
-def send_booking_confirmation_email_with_email(booking, email):
-    """Send booking confirmation email with slot details to the given email address, attaching the QR code image."""
-    subject = 'Parking Booking Confirmation'
-    message = f"""
-    Dear {booking.driver_name},
-    \nYour parking booking has been confirmed!\n\nBooking Details:\n- Booking ID: {booking.booking_id}\n- Parking Slot: {booking.slot.slot_number}\n- Vehicle: {booking.vehicle_no} ({booking.vehicle_type})\n- Date & Time: {booking.booking_time}\n\nPlease arrive on time and present your QR code at the entrance.\n\nThank you for choosing our service!\n\nBest regards,\nSmart Parking Team\n    """
-    try:
-        email_msg = EmailMessage(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [email],
-        )
-        # Attach QR code if it exists
-        if booking.qr_code and hasattr(booking.qr_code, 'path'):
-            email_msg.attach_file(booking.qr_code.path)
-        email_msg.send(fail_silently=False)
-    except Exception as e:
-        print(f"Failed to send booking confirmation email: {e}")
+def get_driver_user_details(vehicle_no):
+    """Return the booking details of the DriverUser owning vehicle_no (or None), cached briefly for re-bookings"""
+    cache_key = DRIVER_USER_CACHE_KEY.format(vehicle_no)
+    details = cache.get(cache_key)
+    if details is None:
+        try:
+            details = DriverUser.objects.values(
+                'name', 'mobile_no', 'vehicle_type', 'email'
+            ).get(vehicle_no=vehicle_no)
+        except DriverUser.DoesNotExist:
+            return None
+        cache.set(cache_key, details, DRIVER_USER_CACHE_TIMEOUT)
+    return details
 
 def confirm_booking(request, slot_id):
     """Confirm booking and create the booking record"""
-    if 'booking_data' not in request.session:
+    booking_data = request.session.get('booking_data')
+    if not booking_data:
         return redirect('booking:home')
     
-    slot = get_object_or_404(Slot, id=slot_id)
+    slot = get_object_or_404(Slot.objects.select_related('category'), id=slot_id)
     
     if not slot.is_available:
         messages.error(request, "This slot has already been booked!")
         return redirect('booking:select_slot')
     
     if request.method == 'POST':
-        booking_data = request.session['booking_data']
         email_to_send = None
         # For registered drivers, get driver details
         if booking_data['booking_type'] == 'registered':
             try:
                 # Look up DriverUser by vehicle_no
-                driver_user = DriverUser.objects.filter(vehicle_no=booking_data['vehicle_no']).first()
+                driver_user = get_driver_user_details(booking_data['vehicle_no'])
                 if driver_user:
-                    driver_name = driver_user.name
-                    mobile_no = driver_user.mobile_no
-                    vehicle_type = driver_user.vehicle_type
-                    email_to_send = driver_user.email
+                    driver_name = driver_user['name']
+                    mobile_no = driver_user['mobile_no']
+                    vehicle_type = driver_user['vehicle_type']
+                    email_to_send = driver_user['email']
                 else:
                     driver_name = "Registered Driver"
                     mobile_no = "N/A"
@@ -256,19 +260,22 @@ def confirm_booking(request, slot_id):
             vehicle_type = booking_data['vehicle_type']
             email_to_send = booking_data.get('email')  # Get email for temporary booking
         
-        booking = Booking(
-            driver_name=driver_name,
-            mobile_no=mobile_no,
-            vehicle_no=booking_data['vehicle_no'],
-            vehicle_type=vehicle_type,
-            slot=slot,
-            booking_time=booking_data['booking_time'],
-        )
-        booking.save()
-        
-        # Send booking confirmation email if email is available
-        if email_to_send:
-            send_booking_confirmation_email_with_email(booking, email_to_send)
+        # Lock the slot row and re-check it, so two concurrent requests can't both book it
+        with transaction.atomic():
+            is_available = Slot.objects.select_for_update().values_list('is_available', flat=True).get(pk=slot.pk)
+            if not is_available:
+                messages.error(request, "This slot has already been booked!")
+                return redirect('booking:select_slot')
+            booking = Booking(
+                driver_name=driver_name,
+                mobile_no=mobile_no,
+                vehicle_no=booking_data['vehicle_no'],
+                vehicle_type=vehicle_type,
+                slot=slot,
+                booking_time=booking_data['booking_time'],
+            )
+            # The confirmation email, if there is an address, is queued behind the QR code
+            booking.save(confirmation_email=email_to_send)
         
         # Clear session data
         del request.session['booking_data']
@@ -277,7 +284,7 @@ def confirm_booking(request, slot_id):
     
     return render(request, 'booking/confirm_booking.html', {
         'slot': slot,
-        'booking_data': request.session['booking_data'],
+        'booking_data': booking_data,
         'category': slot.category
     })
 
@@ -288,6 +295,14 @@ def booking_success(request, booking_id):
         'booking': booking
     })
 
+def qr_status(request, booking_id):
+    """Report whether the booking QR code has been generated yet"""
+    booking = get_object_or_404(Booking, booking_id=booking_id)
+    if booking.qr_code:
+        return JsonResponse({'ready': True, 'url': booking.qr_code.url})
+    return JsonResponse({'ready': False})
+
+@cache_page(STATIC_PAGE_CACHE_TIMEOUT)
 def registration_success(request):
     """Show registration success page"""
     return render(request, 'booking/registration_success.html')
@@ -306,38 +321,6 @@ def login_view(request):
     return render(request, 'booking/login.html')
 
 # Email functions
-def send_welcome_email(driver):
-    """Send welcome email to newly registered driver"""
-    subject = 'Welcome to Smart Parking System'
-    message = f"""
-    Dear {driver.name},
-    
-    Welcome to our Smart Parking System! Your registration has been successful.
-    
-    Registration Details:
-    - Name: {driver.name}
-    - License No: {driver.licence_no}
-    - Email: {driver.email}
-    
-    You can now use the "Registered Driver Booking" option to book parking slots quickly.
-    
-    Thank you for choosing our service!
-    
-    Best regards,
-    Smart Parking Team
-    """
-    
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [driver.email],
-            fail_silently=False
-        )
-    except Exception as e:
-        print(f"Failed to send welcome email: {e}")
-
 def send_booking_confirmation_email(booking):
     """Send booking confirmation email with slot details"""
     subject = 'Parking Booking Confirmation'
@@ -365,6 +348,8 @@ def send_booking_confirmation_email(booking):
     print(f"Booking confirmation for {booking.driver_name}")
 
 # Admin views for slot and booking management
+BOOKINGS_PER_PAGE = 50
+
 def admin_dashboard(request):
     """Admin dashboard for managing slots, bookings, and categories"""
     if 'user_type' not in request.session or request.session['user_type'] != 'admin':
@@ -372,17 +357,20 @@ def admin_dashboard(request):
         return redirect('booking:admin_login')
     
     categories = Category.objects.all()
-    slots = Slot.objects.all()
-    available_slots = slots.filter(is_available=True)
-    occupied_slots = slots.filter(is_available=False)
-    bookings = Booking.objects.all().order_by('-booking_time')
+    # Fetch slots once and count them here rather than re-querying per availability
+    slots = list(Slot.objects.select_related('category'))
+    available_slots_count = sum(1 for slot in slots if slot.is_available)
+    # Bookings are paginated so each request only loads one page; the total comes from a COUNT
+    paginator = Paginator(Booking.objects.select_related('slot').order_by('-booking_time'), BOOKINGS_PER_PAGE)
+    bookings = paginator.get_page(request.GET.get('page'))
     
     return render(request, 'booking/admin_dashboard.html', {
         'categories': categories,
         'slots': slots,
-        'available_slots': available_slots,
-        'occupied_slots': occupied_slots,
-        'bookings': bookings
+        'available_slots_count': available_slots_count,
+        'occupied_slots_count': len(slots) - available_slots_count,
+        'bookings': bookings,
+        'total_bookings': paginator.count,
     })
 
 def delete_booking(request, booking_id):
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from .models import Vehicle, ScanRecord, ParkingSession, ParkingRate
 
 @admin.register(Vehicle)
@@ -9,6 +10,13 @@ class VehicleAdmin(admin.ModelAdmin):
     ordering = ['-registered_at']
 
 
+class ScanRecordChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # The list never shows the parking session, so only join the vehicle and load the listed columns
+        return super().get_queryset(request, exclude_parameters).select_related(None).select_related('vehicle').only(
+            'vehicle__plate_number', 'scan_type', 'timestamp', 'confidence_score', 'image'
+        )
+
 @admin.register(ScanRecord)
 class ScanRecordAdmin(admin.ModelAdmin):
     list_display = ['vehicle', 'scan_type', 'timestamp', 'confidence_score', 'image']
@@ -19,10 +27,39 @@ class ScanRecordAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('vehicle', 'parking_session')
+    
+    def get_changelist(self, request, **kwargs):
+        return ScanRecordChangeList
+
+class ParkingSessionChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).only(
+            'vehicle__plate_number', 'entry_time', 'exit_time', 'is_active', 'total_amount', 'is_paid'
+        )
+
+@admin.register(ParkingSession)
+class ParkingSessionAdmin(admin.ModelAdmin):
+    list_display = ['vehicle', 'entry_time', 'exit_time', 'is_active', 'calc_amount', 'total_amount', 'is_paid']
+    list_filter = ['is_active', 'is_paid', 'entry_time']
+    search_fields = ['vehicle__plate_number']
+    readonly_fields = ['session_id']
+    ordering = ['-entry_time']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('vehicle').annotate(
+            calc_amount=ParkingSession.amount_expression()
+        )
+    
+    def get_changelist(self, request, **kwargs):
+        return ParkingSessionChangeList
+    
+    @admin.display(description='Calculated amount', ordering='calc_amount')
+    def calc_amount(self, obj):
+        return obj.calc_amount
 
 @admin.register(ParkingRate)
 class ParkingRateAdmin(admin.ModelAdmin):
-    list_display = ['name', 'first_hour_rate', 'subsequent_hour_rate', 'max_daily_rate', 'is_active']
+    list_display = ['name', 'first_hour_rate', 'up_to_3_hours_rate', 'up_to_6_hours_rate', 'subsequent_hour_rate', 'max_daily_rate', 'is_active']
     list_filter = ['is_active', 'created_at']
     ordering = ['-created_at']
 
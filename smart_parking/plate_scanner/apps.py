@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PlateScannerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'plate_scanner'
+
+    def ready(self):
+        from . import signals
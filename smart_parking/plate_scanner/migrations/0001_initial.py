@@ -0,0 +1,72 @@
+# Generated by Django 5.0.6 on 2026-10-14 05:07
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParkingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('first_hour_rate', models.DecimalField(decimal_places=2, default=Decimal('50.00'), max_digits=10)),
+                ('subsequent_hour_rate', models.DecimalField(decimal_places=2, default=Decimal('50.00'), max_digits=10)),
+                ('max_daily_rate', models.DecimalField(decimal_places=2, default=Decimal('500.00'), max_digits=10)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ParkingSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('entry_time', models.DateTimeField(default=django.utils.timezone.now)),
+                ('exit_time', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('is_paid', models.BooleanField(default=False)),
+                ('payment_time', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Vehicle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plate_number', models.CharField(max_length=20, unique=True)),
+                ('registered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_registered', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScanRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scan_type', models.CharField(choices=[('ENTRY', 'Entry'), ('EXIT', 'Exit')], max_length=5)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('image', models.ImageField(blank=True, upload_to='scans/')),
+                ('confidence_score', models.FloatField(default=0.0)),
+                ('parking_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='plate_scanner.parkingsession')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='plate_scanner.vehicle')),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddField(
+            model_name='parkingsession',
+            name='vehicle',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='plate_scanner.vehicle'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-14 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plate_scanner', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parkingsession',
+            index=models.Index(fields=['vehicle', 'is_active'], name='plate_scann_vehicle_56f771_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parkingsession',
+            index=models.Index(fields=['entry_time', 'is_active'], name='plate_scann_entry_t_0c8382_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parkingsession',
+            index=models.Index(fields=['payment_time', 'is_paid'], name='plate_scann_payment_fccd39_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scanrecord',
+            index=models.Index(fields=['timestamp', 'scan_type'], name='plate_scann_timesta_9d56f4_idx'),
+        ),
+    ]
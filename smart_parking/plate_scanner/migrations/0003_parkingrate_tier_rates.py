@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-14 05:20
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plate_scanner', '0002_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parkingrate',
+            name='up_to_3_hours_rate',
+            field=models.DecimalField(decimal_places=2, default=Decimal('100.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='parkingrate',
+            name='up_to_6_hours_rate',
+            field=models.DecimalField(decimal_places=2, default=Decimal('200.00'), max_digits=10),
+        ),
+    ]
@@ -1,10 +1,56 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models import Case, DecimalField, DurationField, ExpressionWrapper, F, FloatField, Value, When
+from django.db.models.functions import Cast, Extract, Round
+from django.db.models.lookups import LessThanOrEqual
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
+from django.core.cache import cache
+from datetime import timedelta
 from decimal import Decimal
 import uuid
 
+ACTIVE_RATE_CACHE_KEY = 'plate_scanner:active_rate'
+ACTIVE_RATE_CACHE_TIMEOUT = 3600
+_NOT_CACHED = object()
+# Per-plate parking status responses, kept briefly so bursty UI polling shares one lookup
+PARKING_STATUS_CACHE_KEY = 'plate_scanner:parking_status:{}'
+PARKING_STATUS_CACHE_TIMEOUT = 3
+# Sri Lankan parking rates used when no ParkingRate is active
+DEFAULT_HOUR_RATE = Decimal('50.00')
+DEFAULT_UP_TO_3_HOURS_RATE = Decimal('100.00')
+DEFAULT_UP_TO_6_HOURS_RATE = Decimal('200.00')
+# (driver_name, slot_number) of the booking for a plate, cleared when that plate's bookings change
+PLATE_BOOKING_CACHE_KEY = 'plate_scanner:plate_booking:{}'
+PLATE_BOOKING_CACHE_TIMEOUT = 300
+
+def get_active_rate():
+    """Return the active ParkingRate (or None), cached since it is read on every exit"""
+    rate = cache.get(ACTIVE_RATE_CACHE_KEY, _NOT_CACHED)
+    if rate is _NOT_CACHED:
+        rate = ParkingRate.objects.filter(is_active=True).order_by('-created_at').first()
+        cache.set(ACTIVE_RATE_CACHE_KEY, rate, ACTIVE_RATE_CACHE_TIMEOUT)
+    return rate
+
+def get_tariff():
+    """(first hour, up to 3 hours, up to 6 hours, per hour after 6) prices from the active ParkingRate"""
+    rate = get_active_rate()
+    if rate is None:
+        return DEFAULT_HOUR_RATE, DEFAULT_UP_TO_3_HOURS_RATE, DEFAULT_UP_TO_6_HOURS_RATE, DEFAULT_HOUR_RATE
+    return rate.first_hour_rate, rate.up_to_3_hours_rate, rate.up_to_6_hours_rate, rate.subsequent_hour_rate
+
+def get_plate_booking(plate_number):
+    """Return (driver_name, slot_number) for a plate's booking (or None), cached since every scan reads it"""
+    cache_key = PLATE_BOOKING_CACHE_KEY.format(plate_number)
+    booking = cache.get(cache_key, _NOT_CACHED)
+    if booking is _NOT_CACHED:
+        from booking.models import Booking
+        booking = Booking.objects.filter(vehicle_no=plate_number).values_list(
+            'driver_name', 'slot__slot_number'
+        ).first()
+        cache.set(cache_key, booking, PLATE_BOOKING_CACHE_TIMEOUT)
+    return booking
+
 class Vehicle(models.Model):
     plate_number = models.CharField(max_length=20, unique=True)
     registered_at = models.DateTimeField(default=timezone.now)
@@ -23,70 +69,107 @@ class ParkingSession(models.Model):
     is_paid = models.BooleanField(default=False)
     payment_time = models.DateTimeField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['vehicle', 'is_active']),
+            models.Index(fields=['entry_time', 'is_active']),
+            models.Index(fields=['payment_time', 'is_paid']),
+        ]
+    
     def __str__(self):
         return f"{self.vehicle.plate_number} - {self.session_id}"
     
-    def calculate_amount(self):
-        """Calculate parking fee based on duration"""
-        if not self.exit_time:
+    def calculate_amount(self, until=None):
+        """Calculate parking fee based on duration, up to until for a session still in progress"""
+        end_time = until or self.exit_time
+        if not end_time:
             return Decimal('0.00')
         
-        duration = self.exit_time - self.entry_time
+        duration = end_time - self.entry_time
         hours = duration.total_seconds() / 3600
         
-        # Sri Lankan parking rates (adjust as needed)
+        # Sri Lankan parking rates, priced from the active ParkingRate (Rs. 50/100/200 by default)
+        first_hour, up_to_3_hours, up_to_6_hours, subsequent_hour_rate = get_tariff()
         if hours <= 1:
-            return Decimal('50.00')  # First hour: Rs. 50
+            return first_hour
         elif hours <= 3:
-            return Decimal('100.00')  # Up to 3 hours: Rs. 100
+            return up_to_3_hours
         elif hours <= 6:
-            return Decimal('200.00')  # Up to 6 hours: Rs. 200
+            return up_to_6_hours
         else:
-            # Additional hours after 6 hours: Rs. 50 per hour
+            # Additional hours after 6 hours are charged per hour
             additional_hours = hours - 6
-            return Decimal('200.00') + (Decimal(str(additional_hours)) * Decimal('50.00'))
+            return up_to_6_hours + (Decimal(str(additional_hours)) * subsequent_hour_rate)
+    
+    @classmethod
+    def amount_expression(cls):
+        """Database-side equivalent of calculate_amount, for annotating many sessions in one query"""
+        first_hour, up_to_3_hours, up_to_6_hours, subsequent_hour_rate = get_tariff()
+        
+        amount_field = DecimalField(max_digits=10, decimal_places=2)
+        duration = ExpressionWrapper(F('exit_time') - F('entry_time'), output_field=DurationField())
+        if connection.features.has_native_duration_field:
+            seconds = Extract(duration, 'epoch')
+        else:
+            # Without an interval type (e.g. sqlite) the datetime difference is already a count of microseconds
+            seconds = Cast(duration, FloatField()) / Value(1000000.0)
+        additional_hours = ExpressionWrapper(seconds / Value(3600.0) - Value(6.0), output_field=FloatField())
+        return Case(
+            When(exit_time__isnull=True, then=Value(Decimal('0.00'))),
+            When(LessThanOrEqual(duration, timedelta(hours=1)), then=Value(first_hour)),
+            When(LessThanOrEqual(duration, timedelta(hours=3)), then=Value(up_to_3_hours)),
+            When(LessThanOrEqual(duration, timedelta(hours=6)), then=Value(up_to_6_hours)),
+            # Rounded before the cast, since sqlite's cast to NUMERIC keeps every digit
+            default=Cast(
+                Round(Value(float(up_to_6_hours)) + additional_hours * Value(float(subsequent_hour_rate)), 2),
+                output_field=amount_field
+            ),
+            output_field=amount_field,
+        )
     
     def send_payment_email(self):
         """Send payment notification email to driver"""
         if not self.vehicle.is_registered:
             return False
         
+        # Get driver info from booking app
+        from booking.models import Booking, DriverUser
+        booking = Booking.objects.filter(vehicle_no=self.vehicle.plate_number).first()
+        if not booking:
+            return False
+        # Bookings don't store an email, so address the registered driver who owns the vehicle
         try:
-            # Get driver info from booking app
-            from booking.models import Booking
-            booking = Booking.objects.filter(vehicle_no=self.vehicle.plate_number).first()
-            
-            if booking:
-                subject = f'Parking Payment Due - {self.vehicle.plate_number}'
-                message = f"""
-                Dear {booking.driver_name},
-                
-                Your vehicle ({self.vehicle.plate_number}) has exited the parking facility.
-                
-                Parking Details:
-                - Entry Time: {self.entry_time.strftime('%Y-%m-%d %H:%M:%S')}
-                - Exit Time: {self.exit_time.strftime('%Y-%m-%d %H:%M:%S')}
-                - Total Amount Due: Rs. {self.total_amount}
-                
-                Please make the payment at the parking office or through our online portal.
-                
-                Thank you for using our parking service.
-                
-                Best regards,
-                Smart Parking System
-                """
-                
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [booking.driver_name],  # You might want to add email field to Driver model
-                    fail_silently=False,
-                )
-                return True
-        except Exception as e:
-            print(f"Email error: {e}")
+            email = DriverUser.objects.values_list('email', flat=True).get(vehicle_no=self.vehicle.plate_number)
+        except DriverUser.DoesNotExist:
             return False
+        
+        subject = f'Parking Payment Due - {self.vehicle.plate_number}'
+        message = f"""
+        Dear {booking.driver_name},
+        
+        Your vehicle ({self.vehicle.plate_number}) has exited the parking facility.
+        
+        Parking Details:
+        - Entry Time: {self.entry_time.strftime('%Y-%m-%d %H:%M:%S')}
+        - Exit Time: {self.exit_time.strftime('%Y-%m-%d %H:%M:%S')}
+        - Total Amount Due: Rs. {self.total_amount}
+        
+        Please make the payment at the parking office or through our online portal.
+        
+        Thank you for using our parking service.
+        
+        Best regards,
+        Smart Parking System
+        """
+        
+        send_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
+            fail_silently=False,
+        )
+        return True
 
 class ScanRecord(models.Model):
     ENTRY = 'ENTRY'
@@ -105,11 +188,16 @@ class ScanRecord(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp', 'scan_type']),
+        ]
 
 class ParkingRate(models.Model):
     """Configurable parking rates"""
     name = models.CharField(max_length=100)
     first_hour_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('50.00'))
+    up_to_3_hours_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('100.00'))
+    up_to_6_hours_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('200.00'))
     subsequent_hour_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('50.00'))
     max_daily_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('500.00'))
     is_active = models.BooleanField(default=True)
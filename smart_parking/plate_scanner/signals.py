@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.db import transaction
+from booking.models import Booking, bookings_bulk_created
+from .models import ParkingRate, ParkingSession, Vehicle, ACTIVE_RATE_CACHE_KEY, PARKING_STATUS_CACHE_KEY, PLATE_BOOKING_CACHE_KEY
+
+@receiver([post_save, post_delete], sender=ParkingRate)
+def clear_active_rate_cache(sender, instance, **kwargs):
+    cache.delete(ACTIVE_RATE_CACHE_KEY)
+
+@receiver([post_save, post_delete], sender=ParkingSession)
+def clear_parking_status_cache(sender, instance, **kwargs):
+    if ParkingSession.vehicle.is_cached(instance):
+        plate_number = instance.vehicle.plate_number
+    else:
+        plate_number = Vehicle.objects.filter(pk=instance.vehicle_id).values_list('plate_number', flat=True).first()
+    cache.delete(PARKING_STATUS_CACHE_KEY.format(plate_number))
+
+@receiver([post_save, post_delete], sender=Booking)
+def clear_plate_booking_cache(sender, instance, **kwargs):
+    cache.delete(PLATE_BOOKING_CACHE_KEY.format(instance.vehicle_no))
+
+@receiver(bookings_bulk_created, sender=Booking)
+def clear_bulk_plate_booking_cache(sender, bookings, **kwargs):
+    plate_keys = [PLATE_BOOKING_CACHE_KEY.format(booking.vehicle_no) for booking in bookings]
+    transaction.on_commit(lambda: cache.delete_many(plate_keys))
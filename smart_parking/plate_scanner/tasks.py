@@ -0,0 +1,12 @@
+import smtplib
+from celery import shared_task
+from .models import ParkingSession
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_payment_notification(self, session_id):
+    """Send the payment email for a closed parking session, retrying if the mail server is unavailable"""
+    session = ParkingSession.objects.select_related('vehicle').get(pk=session_id)
+    try:
+        return session.send_payment_email()
+    except (smtplib.SMTPException, OSError) as e:
+        raise self.retry(exc=e)
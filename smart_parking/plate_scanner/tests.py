@@ -0,0 +1,61 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .models import ParkingRate, ParkingSession, Vehicle
+from .scanner import PLATE_LAYOUTS, _layout_candidates, correct_plate_characters
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ParkingAmountTests(TestCase):
+    def test_amount_expression_matches_calculate_amount_at_tier_boundaries(self):
+        ParkingRate.objects.create(
+            name='Test', first_hour_rate=Decimal('150.00'), up_to_3_hours_rate=Decimal('250.00'),
+            up_to_6_hours_rate=Decimal('400.00'), subsequent_hour_rate=Decimal('70.00')
+        )
+        vehicle = Vehicle.objects.create(plate_number='AB1234')
+        entry_time = timezone.now()
+        durations = [
+            timedelta(minutes=30), timedelta(hours=1), timedelta(hours=1, seconds=1),
+            timedelta(hours=3), timedelta(hours=3, seconds=1), timedelta(hours=6),
+            timedelta(hours=6, seconds=1), timedelta(hours=8, minutes=30),
+        ]
+        for duration in durations:
+            ParkingSession.objects.create(vehicle=vehicle, entry_time=entry_time, exit_time=entry_time + duration)
+
+        sessions = ParkingSession.objects.annotate(calc_amount=ParkingSession.amount_expression())
+        for session in sessions:
+            with self.subTest(duration=session.exit_time - session.entry_time):
+                self.assertEqual(session.calc_amount, session.calculate_amount().quantize(Decimal('0.01')))
+
+        # With increasing tier prices, a longer stay never costs less
+        amounts = [session.calculate_amount() for session in sessions.order_by('exit_time')]
+        self.assertEqual(amounts, sorted(amounts))
+
+
+class CorrectPlateCharactersTests(SimpleTestCase):
+    def test_corrects_each_layout(self):
+        # letters-digits-letters, then digits-letters-digits
+        self.assertEqual(correct_plate_characters('AB1ZCD'), 'AB12CD')
+        self.assertEqual(correct_plate_characters('I2ABC34S'), '12ABC345')
+
+    def test_layout_candidates(self):
+        letters_first, digits_first = PLATE_LAYOUTS
+        self.assertEqual(list(_layout_candidates('A8I2CD', letters_first)), ['A812CD', 'AB12CD'])
+        self.assertEqual(list(_layout_candidates('A8I2CD', digits_first)), [])
+        self.assertEqual(list(_layout_candidates('AB1234', letters_first)), [])
+
+    def test_prefers_fewest_corrections(self):
+        # A812CD changes only the I; AB12CD would also change the 8
+        self.assertEqual(correct_plate_characters('A8I2CD'), 'A812CD')
+        # Both layouts fit; the unchanged reading wins over O0O
+        self.assertEqual(correct_plate_characters('0O0'), '0O0')
+
+    def test_leaves_unstructured_reads_alone(self):
+        for text in ('AB-12CD', 'ABCD', '1234', 'AB1234'):
+            with self.subTest(text=text):
+                self.assertIsNone(correct_plate_characters(text))
@@ -12,7 +12,7 @@ urlpatterns = [
     path('api/process-entrance/', views.process_entry, name='process_entrance'),
     path('api/process-exit/', views.process_exit, name='process_exit'),
     path('api/quick-scan/', views.quick_scan, name='quick_scan'),
-    path('api/real-time-scan/', views.real_time_scan, name='real_time_scan'),
+    path('api/detections-stream/', views.stream_detections, name='stream_detections'),
     path('api/parking-status/<str:plate_number>/', views.get_parking_status, name='parking_status'),
     path('api/camera-status/', views.camera_status, name='camera_status'),
     path('api/system-status/', views.system_status, name='system_status'),
@@ -4,14 +4,18 @@ from django.views.decorators.http import require_GET
 @require_GET
 def api_latest_scans(request):
     from plate_scanner.models import ScanRecord
-    scans = ScanRecord.objects.select_related('vehicle').order_by('-timestamp')[:10]
+    # Plain rows are enough for the JSON, so no model instances are built
+    scans = ScanRecord.objects.order_by('-timestamp').values(
+        'vehicle__plate_number', 'scan_type', 'timestamp', 'confidence_score', 'image'
+    )[:10]
+    image_storage = ScanRecord._meta.get_field('image').storage
     data = [
         {
-            'plate_number': scan.vehicle.plate_number if scan.vehicle else '',
-            'scan_type': scan.scan_type,
-            'timestamp': scan.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'confidence_score': scan.confidence_score,
-            'image_url': scan.image.url if scan.image else '',
+            'plate_number': scan['vehicle__plate_number'],
+            'scan_type': scan['scan_type'],
+            'timestamp': scan['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
+            'confidence_score': scan['confidence_score'],
+            'image_url': image_storage.url(scan['image']) if scan['image'] else '',
         }
         for scan in scans
     ]
@@ -37,7 +41,10 @@ def qr_code_bill(request):
             session = ParkingSession.objects.filter(vehicle__plate_number=code, is_active=False).order_by('-exit_time').first()
             if not session:
                 # Try by session id (if QR encodes session id)
-                session = ParkingSession.objects.filter(id=code).first()
+                try:
+                    session = ParkingSession.objects.get(id=code)
+                except (ParkingSession.DoesNotExist, ValueError):
+                    session = None
             if not session:
                 return JsonResponse({'status': 'error', 'message': 'No parking session found for this QR code.'})
 
@@ -70,23 +77,54 @@ def qr_code_bill(request):
     return JsonResponse({'status': 'error', 'message': 'POST required.'})
 
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Q
 from django.utils import timezone
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from datetime import datetime, timedelta
-from .scanner import PlateScanner
-import base64
-import numpy as np
-from plate_scanner.models import Vehicle, ScanRecord, ParkingSession, ParkingRate
+from .scanner import PlateScanner, probe_cameras
+from plate_scanner.models import Vehicle, ScanRecord, ParkingSession, ParkingRate, PARKING_STATUS_CACHE_KEY, PARKING_STATUS_CACHE_TIMEOUT, get_plate_booking
 from booking.models import Booking
 import traceback
 import logging
+import threading
+import json
+import time
 from django.views.decorators.csrf import csrf_exempt
 
 logger = logging.getLogger(__name__)
-scanner = PlateScanner()
+
+CAMERA_PROBE_CACHE_KEY = 'plate_scanner:camera_probe'
+CAMERA_PROBE_CACHE_TIMEOUT = 60
+
+# Comment line sent on an idle detections stream so proxies don't close it
+SSE_KEEPALIVE_INTERVAL = 15
+
+VEHICLE_HISTORY_PER_PAGE = 50
+
+# Built on first use rather than at import, so workers that never scan don't load the OCR models
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def day_bounds(start_date, end_date=None):
+    """Aware [start, end) datetimes spanning whole local days"""
+    # Comparing the raw column, unlike a __date lookup, lets the database use its index
+    end_date = end_date or start_date
+    start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    return start, end
+
+def get_scanner():
+    """Return the shared PlateScanner, creating it on first call"""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = PlateScanner()
+    return _scanner
 
 def entrance_view(request):
     return render(request, 'plate_scanner/entrance.html')
@@ -100,6 +138,7 @@ def qr_scanner_view(request):
 
 @csrf_exempt
 def start_scan(request):
+    scanner = get_scanner()
     if request.method == 'POST':
         try:
             success = scanner.start_camera()
@@ -126,6 +165,7 @@ def start_scan(request):
 
 @csrf_exempt
 def stop_scan(request):
+    scanner = get_scanner()
     if request.method == 'POST':
         try:
             scanner.stop_camera()
@@ -136,10 +176,11 @@ def stop_scan(request):
 
 @csrf_exempt
 def process_scan(request, scan_type):
+    scanner = get_scanner()
     if request.method == 'POST':
         try:
             # Check if camera is working
-            if not scanner.scanning or not scanner.camera:
+            if not scanner.scanning:
                 return JsonResponse({
                     'status': 'error', 
                     'message': 'Camera not started. Please start the number plate scanner first.'
@@ -167,17 +208,17 @@ def process_scan(request, scan_type):
                         'text': detected_text,
                         'confidence': confidence,
                         'scan_type': scan_type,
-                        'timestamp': datetime.now().isoformat(),
+                        'timestamp': timezone.now().isoformat(),
                         'scan_mode': 'fast-simple'
                     }
                     
                     # Check if vehicle is registered
                     try:
-                        booking = Booking.objects.filter(vehicle_no=detected_text).first()
+                        # Driver name and slot number, served from the cache for plates scanned before
+                        booking = get_plate_booking(detected_text)
                         if booking:
                             response_data['is_registered'] = True
-                            response_data['driver_name'] = booking.driver_name
-                            response_data['slot_number'] = booking.slot.slot_number
+                            response_data['driver_name'], response_data['slot_number'] = booking
                         else:
                             response_data['is_registered'] = False
                     except Exception as e:
@@ -190,7 +231,7 @@ def process_scan(request, scan_type):
                             parking_session = ParkingSession.objects.filter(
                                 vehicle__plate_number=detected_text,
                                 is_active=False
-                            ).order_by('-exit_time').first()
+                            ).only('total_amount', 'entry_time', 'exit_time').order_by('-exit_time').first()
                             
                             if parking_session:
                                 response_data['amount_due'] = str(parking_session.total_amount)
@@ -225,10 +266,11 @@ def process_exit(request):
 @csrf_exempt
 def quick_scan(request):
     """Fast scanning endpoint for immediate number plate detection"""
+    scanner = get_scanner()
     if request.method == 'POST':
         try:
             # Check if camera is working
-            if not scanner.scanning or not scanner.camera:
+            if not scanner.scanning:
                 return JsonResponse({
                     'status': 'error', 
                     'message': 'Camera not started'
@@ -251,7 +293,7 @@ def quick_scan(request):
                     'status': 'success',
                     'text': detected_text,
                     'confidence': confidence,
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': timezone.now().isoformat(),
                     'scan_mode': 'fast-simple'
                 })
             
@@ -264,58 +306,55 @@ def quick_scan(request):
                 'message': str(e)
             })
 
-@csrf_exempt
-def real_time_scan(request):
-    """Real-time scanning endpoint"""
-    if request.method == 'POST':
-        try:
-            # Check if camera is working
-            if not scanner.scanning or not scanner.camera:
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': 'Camera not started'
-                })
-            
-            # Process frame
-            frame, texts = scanner.process_frame()
-            
-            if frame is None:
-                return JsonResponse({
-                    'status': 'error', 
-                    'message': 'Camera error'
-                })
-            
-            if texts:
-                # Return all detected texts
-                detected_texts = []
-                for text_info in texts:
-                    detected_texts.append({
-                        'text': text_info['text'],
-                        'confidence': text_info['confidence']
-                    })
-                
-                return JsonResponse({
+def sse_event(payload):
+    """Format a payload as a server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+@require_GET
+def stream_detections(request):
+    """Push real-time scan results to the page as server-sent events"""
+    scanner = get_scanner()
+
+    def events():
+        if not scanner.scanning:
+            yield sse_event({'status': 'error', 'message': 'Camera not started'})
+            return
+        last_payload = None
+        last_sent = time.monotonic()
+        for texts in scanner.stream_texts():
+            if texts is None:
+                # No new result within the wait; only a keepalive may be due
+                payload = last_payload
+            elif texts:
+                payload = {
                     'status': 'success',
-                    'texts': detected_texts,
-                    'timestamp': datetime.now().isoformat(),
+                    'texts': [{'text': t['text'], 'confidence': t['confidence']} for t in texts],
                     'scan_mode': 'fast-simple'
-                })
-            
-            return JsonResponse({'status': 'no_text'})
-            
-        except Exception as e:
-            logger.error(f"Error in real-time scan: {e}")
-            return JsonResponse({
-                'status': 'error', 
-                'message': str(e)
-            })
+                }
+            else:
+                payload = {'status': 'no_text'}
+            # Only changes are sent; the page keeps showing the last result until then
+            if payload != last_payload:
+                last_payload = payload
+                last_sent = time.monotonic()
+                yield sse_event({**payload, 'timestamp': timezone.now().isoformat()} if texts else payload)
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE_INTERVAL:
+                last_sent = time.monotonic()
+                yield ": keepalive\n\n"
+        yield sse_event({'status': 'error', 'message': 'Scanner stopped'})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @staff_member_required
 def admin_dashboard(request):
     """Admin dashboard showing parking statistics and payments"""
     
     # Get date range for filtering
-    today = timezone.now().date()
+    now = timezone.now()
+    today = now.date()
     start_date = request.GET.get('start_date', today.strftime('%Y-%m-%d'))
     end_date = request.GET.get('end_date', today.strftime('%Y-%m-%d'))
     
@@ -327,20 +366,19 @@ def admin_dashboard(request):
         end_date = today
     
     # Get parking sessions for the date range
+    range_start, range_end = day_bounds(start_date, end_date)
     sessions = ParkingSession.objects.filter(
-        entry_time__date__range=[start_date, end_date]
+        entry_time__gte=range_start, entry_time__lt=range_end
     )
     
-    # Calculate statistics
-    total_sessions = sessions.count()
-    active_sessions = sessions.filter(is_active=True).count()
-    completed_sessions = sessions.filter(is_active=False).count()
-    total_revenue = sessions.filter(is_paid=True).aggregate(
-        total=Sum('total_amount')
-    )['total'] or 0
-    pending_payments = sessions.filter(is_active=False, is_paid=False).aggregate(
-        total=Sum('total_amount')
-    )['total'] or 0
+    # Calculate statistics in a single pass over the date range
+    stats = sessions.aggregate(
+        total_sessions=Count('pk'),
+        active_sessions=Count('pk', filter=Q(is_active=True)),
+        completed_sessions=Count('pk', filter=Q(is_active=False)),
+        total_revenue=Sum('total_amount', filter=Q(is_paid=True)),
+        pending_payments=Sum('total_amount', filter=Q(is_active=False, is_paid=False)),
+    )
     
     # Get recent activities
     recent_scans = ScanRecord.objects.select_related('vehicle', 'parking_session').order_by('-timestamp')[:10]
@@ -358,15 +396,15 @@ def admin_dashboard(request):
     context = {
         'start_date': start_date,
         'end_date': end_date,
-        'total_sessions': total_sessions,
-        'active_sessions': active_sessions,
-        'completed_sessions': completed_sessions,
-        'total_revenue': total_revenue,
-        'pending_payments': pending_payments,
+        'total_sessions': stats['total_sessions'],
+        'active_sessions': stats['active_sessions'],
+        'completed_sessions': stats['completed_sessions'],
+        'total_revenue': stats['total_revenue'] or 0,
+        'pending_payments': stats['pending_payments'] or 0,
         'recent_scans': recent_scans,
         'currently_parked': currently_parked,
         'payment_history': payment_history,
-        'now': timezone.now(),
+        'now': now,
     }
     
     return render(request, 'plate_scanner/admin_dashboard.html', context)
@@ -375,15 +413,15 @@ def admin_dashboard(request):
 def mark_payment_received(request, session_id):
     """Mark a parking session as paid"""
     if request.method == 'POST':
-        try:
-            session = ParkingSession.objects.get(session_id=session_id)
-            session.is_paid = True
-            session.payment_time = timezone.now()
-            session.save()
-            logger.info(f"Payment marked as received for session {session_id}")
-            return JsonResponse({'status': 'success'})
-        except ParkingSession.DoesNotExist:
+        # A single UPDATE of the two payment columns; the cached parking status doesn't include them,
+        # so skipping post_save leaves nothing stale
+        updated = ParkingSession.objects.filter(session_id=session_id).update(
+            is_paid=True, payment_time=timezone.now()
+        )
+        if not updated:
             return JsonResponse({'status': 'error', 'message': 'Session not found'})
+        logger.info(f"Payment marked as received for session {session_id}")
+        return JsonResponse({'status': 'success'})
     
     return JsonResponse({'status': 'error', 'message': 'Invalid request'})
 
@@ -392,12 +430,18 @@ def vehicle_details(request, plate_number):
     """Get detailed information about a specific vehicle"""
     try:
         vehicle = Vehicle.objects.get(plate_number=plate_number)
-        parking_sessions = ParkingSession.objects.filter(vehicle=vehicle).order_by('-entry_time')
-        scan_records = ScanRecord.objects.filter(vehicle=vehicle).order_by('-timestamp')
+        # History is paginated so a long-lived vehicle doesn't load every session and scan per request
+        parking_sessions = Paginator(
+            ParkingSession.objects.filter(vehicle=vehicle).order_by('-entry_time'), VEHICLE_HISTORY_PER_PAGE
+        ).get_page(request.GET.get('page'))
+        scan_records = Paginator(
+            ScanRecord.objects.filter(vehicle=vehicle).order_by('-timestamp'), VEHICLE_HISTORY_PER_PAGE
+        ).get_page(request.GET.get('scans_page'))
         booking = Booking.objects.filter(vehicle_no=plate_number).first()
         
         context = {
             'vehicle': vehicle,
+            'active_sessions': ParkingSession.objects.filter(vehicle=vehicle, is_active=True).order_by('-entry_time'),
             'parking_sessions': parking_sessions,
             'scan_records': scan_records,
             'booking': booking,
@@ -410,7 +454,11 @@ def vehicle_details(request, plate_number):
 def get_parking_status(request, plate_number):
     """API endpoint to get parking status for a vehicle"""
     try:
-        status = scanner.get_parking_status(plate_number)
+        cache_key = PARKING_STATUS_CACHE_KEY.format(plate_number)
+        status = cache.get(cache_key)
+        if status is None:
+            status = get_scanner().get_parking_status(plate_number)
+            cache.set(cache_key, status, PARKING_STATUS_CACHE_TIMEOUT)
         return JsonResponse(status)
     except Exception as e:
         logger.error(f"Error getting parking status: {e}")
@@ -418,33 +466,17 @@ def get_parking_status(request, plate_number):
 
 def camera_status(request):
     """Check camera status and return available cameras"""
+    scanner = get_scanner()
     try:
-        working_cameras = []
-        camera_details = []
-        
-        for i in range(4):
-            try:
-                import cv2
-                cap = cv2.VideoCapture(i)
-                if cap.isOpened():
-                    ret, frame = cap.read()
-                    if ret and frame is not None:
-                        working_cameras.append(i)
-                        camera_details.append({
-                            'index': i,
-                            'resolution': f"{frame.shape[1]}x{frame.shape[0]}",
-                            'channels': frame.shape[2] if len(frame.shape) > 2 else 1
-                        })
-                    cap.release()
-            except Exception as e:
-                logger.error(f"Error testing camera {i}: {e}")
-                continue
+        # Opening each device takes hundreds of ms, so the enumeration is shared for a minute
+        camera_details = cache.get_or_set(CAMERA_PROBE_CACHE_KEY, probe_cameras, CAMERA_PROBE_CACHE_TIMEOUT)
+        working_cameras = [camera['index'] for camera in camera_details]
         
         return JsonResponse({
             'status': 'success',
             'working_cameras': working_cameras,
             'camera_details': camera_details,
-            'current_camera': scanner.camera_index if scanner.camera else None,
+            'current_camera': scanner.camera_index if scanner.camera is not None else None,
             'scanner_status': 'active' if scanner.scanning else 'inactive',
             'scan_mode': 'fast-simple'
         })
@@ -457,36 +489,37 @@ def camera_status(request):
 
 def system_status(request):
     """Get comprehensive system status"""
+    scanner = get_scanner()
     try:
         # Get scanner status
         scanner_status = scanner.get_system_status()
         
-        # Get database statistics
+        # Get database statistics, with today's figures folded into one aggregate per table
+        now = timezone.now()
+        day_start, day_end = day_bounds(now.date())
         total_vehicles = Vehicle.objects.count()
-        total_scans = ScanRecord.objects.count()
-        active_sessions = ParkingSession.objects.filter(is_active=True).count()
-        
-        # Get today's statistics
-        today = timezone.now().date()
-        today_scans = ScanRecord.objects.filter(timestamp__date=today).count()
-        today_sessions = ParkingSession.objects.filter(entry_time__date=today).count()
-        today_revenue = ParkingSession.objects.filter(
-            payment_time__date=today,
-            is_paid=True
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
+        scan_stats = ScanRecord.objects.aggregate(
+            total_scans=Count('pk'),
+            today_scans=Count('pk', filter=Q(timestamp__gte=day_start, timestamp__lt=day_end)),
+        )
+        session_stats = ParkingSession.objects.aggregate(
+            active_sessions=Count('pk', filter=Q(is_active=True)),
+            today_sessions=Count('pk', filter=Q(entry_time__gte=day_start, entry_time__lt=day_end)),
+            today_revenue=Sum('total_amount', filter=Q(payment_time__gte=day_start, payment_time__lt=day_end, is_paid=True)),
+        )
         
         status = {
             'scanner': scanner_status,
             'database': {
                 'total_vehicles': total_vehicles,
-                'total_scans': total_scans,
-                'active_sessions': active_sessions,
-                'today_scans': today_scans,
-                'today_sessions': today_sessions,
-                'today_revenue': float(today_revenue)
+                'total_scans': scan_stats['total_scans'],
+                'active_sessions': session_stats['active_sessions'],
+                'today_scans': scan_stats['today_scans'],
+                'today_sessions': session_stats['today_sessions'],
+                'today_revenue': float(session_stats['today_revenue'] or 0)
             },
             'system': {
-                'timestamp': timezone.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'uptime': 'System running',
                 'version': '1.0.0',
                 'scan_mode': 'fast-simple'
@@ -504,34 +537,27 @@ def system_status(request):
 def get_today_stats(request):
     """Get today's statistics for real-time updates"""
     try:
-        today = timezone.now().date()
+        now = timezone.now()
+        day_start, day_end = day_bounds(now.date())
         
         # Today's entries and exits
-        today_entries = ScanRecord.objects.filter(
-            scan_type='ENTRY',
-            timestamp__date=today
-        ).count()
-        
-        today_exits = ScanRecord.objects.filter(
-            scan_type='EXIT',
-            timestamp__date=today
-        ).count()
+        scan_stats = ScanRecord.objects.filter(timestamp__gte=day_start, timestamp__lt=day_end).aggregate(
+            today_entries=Count('pk', filter=Q(scan_type='ENTRY')),
+            today_exits=Count('pk', filter=Q(scan_type='EXIT')),
+        )
         
-        # Today's revenue
-        today_revenue = ParkingSession.objects.filter(
-            payment_time__date=today,
-            is_paid=True
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-        
-        # Currently parked
-        currently_parked = ParkingSession.objects.filter(is_active=True).count()
+        # Today's revenue and vehicles currently parked
+        session_stats = ParkingSession.objects.aggregate(
+            today_revenue=Sum('total_amount', filter=Q(payment_time__gte=day_start, payment_time__lt=day_end, is_paid=True)),
+            currently_parked=Count('pk', filter=Q(is_active=True)),
+        )
         
         return JsonResponse({
-            'today_entries': today_entries,
-            'today_exits': today_exits,
-            'today_revenue': float(today_revenue),
-            'currently_parked': currently_parked,
-            'timestamp': timezone.now().isoformat()
+            'today_entries': scan_stats['today_entries'],
+            'today_exits': scan_stats['today_exits'],
+            'today_revenue': float(session_stats['today_revenue'] or 0),
+            'currently_parked': session_stats['currently_parked'],
+            'timestamp': now.isoformat()
         })
     except Exception as e:
         logger.error(f"Error getting today's stats: {e}")
@@ -543,32 +569,34 @@ def get_today_stats(request):
 @csrf_exempt
 def test_camera(request):
     """Test camera functionality"""
+    scanner = get_scanner()
     if request.method == 'POST':
         try:
-            # Try to start camera temporarily
-            success = scanner.start_camera()
-            if success:
-                # Read a test frame
-                ret, frame = scanner.camera.read()
-                if ret and frame is not None:
-                    scanner.stop_camera()
-                    return JsonResponse({
-                        'success': True,
-                        'message': f'Camera test successful. Frame size: {frame.shape[1]}x{frame.shape[0]}',
-                        'frame_size': f"{frame.shape[1]}x{frame.shape[0]}",
-                        'scan_mode': 'fast-simple'
-                    })
-                else:
-                    scanner.stop_camera()
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'Camera opened but cannot read frames'
-                    })
-            else:
+            # A running scanner already has a live frame; only open the camera when it is stopped,
+            # and then only close it again if this test opened it
+            started_here = not scanner.scanning
+            if started_here and not scanner.start_camera():
                 return JsonResponse({
                     'success': False,
                     'message': scanner.get_camera_error() or 'Failed to start camera'
                 })
+            
+            # Use the frame the capture thread has already read
+            frame = scanner.latest_frame
+            if started_here:
+                scanner.stop_camera()
+            if frame is not None:
+                return JsonResponse({
+                    'success': True,
+                    'message': f'Camera test successful. Frame size: {frame.shape[1]}x{frame.shape[0]}',
+                    'frame_size': f"{frame.shape[1]}x{frame.shape[0]}",
+                    'scan_mode': 'fast-simple'
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Camera opened but cannot read frames'
+                })
         except Exception as e:
             logger.error(f"Error testing camera: {e}")
             return JsonResponse({
@@ -0,0 +1,16 @@
+"""
+Celery config for smart_parking project.
+
+Start a worker with:
+    celery -A smart_parking worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_parking.settings')
+
+app = Celery('smart_parking')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
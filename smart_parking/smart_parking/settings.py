@@ -30,6 +30,13 @@ EMAIL_USE_SSL = False
 # EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Celery (background tasks such as QR code generation)
+CELERY_BROKER_URL = 'redis://127.0.0.1:6379/0'
+CELERY_TASK_IGNORE_RESULT = True
+
+# For development without a Redis broker, run tasks inline instead
+# CELERY_TASK_ALWAYS_EAGER = True
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -107,6 +114,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Redis via Django's built-in backend (uses the redis package from requirements.txt)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+# Keep sessions in the cache so session reads/writes don't hit the database on every request
+SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+SESSION_CACHE_ALIAS = 'default'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 